@@ -5,19 +5,32 @@ My Machine Bot - A local chatbot that knows about your system.
 Uses Ollama for LLM and has access to system monitoring tools.
 """
 
+import asyncio
 import json
+import re
+import time
 import ollama
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.prompt import Prompt
+from rich.spinner import Spinner
 from system_tools import TOOLS
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the stdlib json module
+    orjson = None
+
 console = Console()
 
 # The model to use - llama3.2 is good for tool use, but you can change this
 MODEL = "llama3.2"
 
+# How long Ollama keeps the model loaded between requests
+KEEP_ALIVE = "30m"
+
 # System prompt that tells the bot what tools it has
 SYSTEM_PROMPT = """You are a helpful assistant that runs locally on the user's machine. 
 You have access to tools that can retrieve information about the system you're running on.
@@ -42,75 +55,219 @@ After receiving tool results, explain them to the user in a friendly, clear way.
 You can use multiple tools if needed to answer complex questions.
 """
 
+# Older chat history is folded into a summary so prompts stay a bounded size
+HISTORY_WINDOW = 12  # most recent messages always sent verbatim
+HISTORY_LIMIT = 20  # unsummarized messages allowed before summarizing again
+
+SUMMARY_PROMPT = """Summarize this conversation between a user and an assistant that reports on the user's machine.
+Keep the questions asked, key numbers from tool results, and anything the user said about themselves or their setup.
+Be brief."""
+
+# TOOLS is static, so the formatted system message is built once at import
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": SYSTEM_PROMPT.format(
+        tools="\n".join(f"- {name}: {info['description']}" for name, info in TOOLS.items())
+    ),
+}
+
+# How long tool results are reused when a tool doesn't set its own cache_ttl
+DEFAULT_TOOL_CACHE_TTL = 5.0
+
+# Recent tool results: tool name -> (expiry time, result)
+_tool_cache: dict[str, tuple[float, str]] = {}
+
+# Rolling summary of the chat history: how many leading messages it covers and the text
+_history_summary = {"covered": 0, "text": ""}
 
-def format_tool_descriptions() -> str:
-    """Format tool descriptions for the system prompt."""
-    lines = []
-    for name, info in TOOLS.items():
-        lines.append(f"- {name}: {info['description']}")
-    return "\n".join(lines)
+# Matches tool calls like [TOOL: get_cpu_info]
+_TOOL_RE = re.compile(r'\[TOOL:\s*(\w+)\]')
+
+# Matches an unfinished tool call at the end of a partial response, like "[TOO" or "[TOOL: get_c"
+_PARTIAL_TOOL_RE = re.compile(r'\[(?:T(?:O(?:O(?:L(?::\s*\w*)?)?)?)?)?$')
 
 
 def extract_tool_calls(response: str) -> list[str]:
     """Extract tool calls from the response."""
-    import re
-    pattern = r'\[TOOL:\s*(\w+)\]'
-    return re.findall(pattern, response)
+    return _TOOL_RE.findall(response)
 
 
-def execute_tool(tool_name: str) -> str:
-    """Execute a tool and return the result."""
-    if tool_name in TOOLS:
-        try:
-            result = TOOLS[tool_name]["function"]()
-            return json.dumps(result, indent=2)
-        except Exception as e:
-            return f"Error executing {tool_name}: {str(e)}"
-    return f"Unknown tool: {tool_name}"
+def tool_calls_end(response: str) -> int | None:
+    """Find where the tool calls end once a partial response has moved past them."""
+    matches = list(_TOOL_RE.finditer(response))
+    if not matches:
+        return None
+    # Keep reading while the text after the last call could still be another call
+    end = matches[-1].end()
+    tail = response[end:].lstrip()
+    if not tail or tail.startswith("[TOOL:") or "[TOOL:".startswith(tail):
+        return None
+    return end
 
 
-def chat(user_message: str, history: list) -> str:
-    """Send a message and get a response, handling tool calls."""
+def visible_text(response: str, streaming: bool = False) -> str:
+    """Strip tool calls from text shown to the user.
     
-    # Add user message to history
-    history.append({"role": "user", "content": user_message})
+    While streaming, a trailing half-written tool call is hidden as well.
+    """
+    text = _TOOL_RE.sub("", response)
+    if streaming:
+        text = _PARTIAL_TOOL_RE.sub("", text)
+    return text.strip()
+
+
+def to_json(data) -> str:
+    """Serialize tool output as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
+
+def execute_tool(tool_name: str) -> str:
+    """Execute a tool and return the result, reusing recent results."""
+    cached = _tool_cache.get(tool_name)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
     
-    # Get initial response
-    response = ollama.chat(
-        model=MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT.format(tools=format_tool_descriptions())},
-            *history
-        ]
-    )
+    tool = TOOLS.get(tool_name)
+    if tool is None:
+        return to_json({"error": f"Unknown tool: {tool_name}"})
+    try:
+        result = to_json(tool["function"]())
+    except Exception as e:
+        return to_json({"error": f"Error executing {tool_name}: {e}"})
+    _tool_cache[tool_name] = (time.monotonic() + tool.get("cache_ttl", DEFAULT_TOOL_CACHE_TTL), result)
+    return result
+
+
+async def run_tool(tool_name: str) -> str:
+    """Execute a tool in a worker thread so blocking psutil calls can overlap."""
+    console.print(f"[dim]🔧 Running {tool_name}...[/dim]")
+    result = await asyncio.to_thread(execute_tool, tool_name)
+    return f"Results from {tool_name}:\n{result}"
+
+
+def is_question(history: list, index: int) -> bool:
+    """Check whether a history message is a user question rather than tool results."""
+    message = history[index]
+    return message["role"] == "user" and not message.get("_tool_results")
+
+
+async def summarize_history(client: ollama.AsyncClient, history: list):
+    """Fold everything but the most recent messages into the rolling summary."""
+    if _history_summary["covered"] > len(history):
+        # A new conversation was started
+        _history_summary.update(covered=0, text="")
+    if len(history) - _history_summary["covered"] <= HISTORY_LIMIT:
+        return
     
-    assistant_message = response["message"]["content"]
+    # Back up to the start of a turn so the kept messages begin with a question
+    end = len(history) - HISTORY_WINDOW
+    while end > _history_summary["covered"] and not is_question(history, end):
+        end -= 1
+    if end <= _history_summary["covered"]:
+        return
     
-    # Check for tool calls
-    tool_calls = extract_tool_calls(assistant_message)
+    transcript = "\n\n".join(
+        f"{message['role']}: {message['content']}"
+        for message in history[_history_summary["covered"]:end]
+    )
+    if _history_summary["text"]:
+        transcript = f"Summary so far:\n{_history_summary['text']}\n\nLater messages:\n\n{transcript}"
     
-    if tool_calls:
-        # Execute tools and gather results
-        tool_results = []
-        for tool_name in tool_calls:
-            console.print(f"[dim]🔧 Running {tool_name}...[/dim]")
-            result = execute_tool(tool_name)
-            tool_results.append(f"Results from {tool_name}:\n{result}")
-        
-        # Add tool results to context and get final response
-        tool_context = "\n\n".join(tool_results)
-        history.append({"role": "assistant", "content": assistant_message})
-        history.append({"role": "user", "content": f"Here are the tool results:\n\n{tool_context}\n\nPlease explain these results to me in a friendly, easy-to-understand way."})
-        
-        final_response = ollama.chat(
+    with console.status("[dim]Summarizing earlier conversation...[/dim]"):
+        response = await client.chat(
             model=MODEL,
             messages=[
-                {"role": "system", "content": SYSTEM_PROMPT.format(tools=format_tool_descriptions())},
-                *history
-            ]
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript},
+            ],
+            keep_alive=KEEP_ALIVE,
+        )
+    _history_summary.update(covered=end, text=response["message"]["content"])
+
+
+def build_messages(history: list) -> list:
+    """Build the prompt from the system message, the summary, and recent history."""
+    messages = [_SYSTEM_MESSAGE]
+    if _history_summary["text"]:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation:\n{_history_summary['text']}"})
+    # Drop private bookkeeping keys before sending messages to the model
+    messages.extend(
+        {key: value for key, value in message.items() if not key.startswith("_")}
+        for message in history[_history_summary["covered"]:]
+    )
+    return messages
+
+
+async def stream_reply(client: ollama.AsyncClient, messages: list, stop_at_tools: bool = False) -> str:
+    """Stream a response from the model, rendering it live as tokens arrive."""
+    assistant_message = ""
+    # The live view is cleared when done and the full reply printed once, since
+    # Rich can't redraw output taller than the terminal
+    with Live(
+        Spinner("dots", text="[bold blue]Thinking...[/bold blue]"),
+        console=console,
+        refresh_per_second=10,
+        transient=True,
+    ) as live:
+        stream = await client.chat(model=MODEL, messages=messages, stream=True, keep_alive=KEEP_ALIVE)
+        async for chunk in stream:
+            assistant_message += chunk["message"]["content"]
+            end = tool_calls_end(assistant_message) if stop_at_tools else None
+            if end is not None:
+                # Drop whatever followed the tool calls; closing the stream
+                # stops generation on the server
+                assistant_message = assistant_message[:end]
+                await stream.aclose()
+                break
+            text = visible_text(assistant_message, streaming=True)
+            if text:
+                live.update(Markdown(text))
+    
+    text = visible_text(assistant_message)
+    if text:
+        console.print(Markdown(text))
+    return assistant_message
+
+
+async def chat(user_message: str, history: list) -> str:
+    """Send a message and get a response, handling tool calls."""
+    # Each turn runs in its own event loop, so the client is closed with it
+    async with ollama.AsyncClient() as client:
+        # Add user message to history
+        history.append({"role": "user", "content": user_message})
+        await summarize_history(client, history)
+        
+        # Get initial response, cutting it short once the tool calls are known
+        assistant_message = await stream_reply(
+            client,
+            build_messages(history),
+            stop_at_tools=True,
         )
         
-        assistant_message = final_response["message"]["content"]
+        # Check for tool calls
+        tool_calls = extract_tool_calls(assistant_message)
+        
+        if tool_calls:
+            # Execute tools concurrently and gather results
+            tool_results = await asyncio.gather(*[run_tool(tool_name) for tool_name in tool_calls])
+            
+            # Add tool results to context and get final response
+            tool_context = "\n\n".join(tool_results)
+            # Results are flagged with a private key so history trimming can
+            # tell them apart from real questions
+            # Early-stopped replies are trimmed to their last tool call, so a reply
+            # with no visible text was nothing but tool calls
+            if visible_text(assistant_message):
+                history.append({"role": "assistant", "content": assistant_message})
+                history.append({"role": "user", "content": f"Here are the tool results:\n\n{tool_context}\n\nPlease explain these results to me in a friendly, easy-to-understand way.", "_tool_results": True})
+            else:
+                # Send just the results instead of the markers and a wrapper prompt.
+                # A plain user message works with every model's chat template.
+                history.append({"role": "user", "content": f"Tool results:\n\n{tool_context}", "_tool_results": True})
+            
+            assistant_message = await stream_reply(client, build_messages(history))
     
     history.append({"role": "assistant", "content": assistant_message})
     return assistant_message
@@ -129,12 +286,17 @@ def main():
     # Check if model is available
     try:
         models = ollama.list()
-        model_names = [m["name"].split(":")[0] for m in models.get("models", [])]
-        if MODEL not in model_names and f"{MODEL}:latest" not in [m["name"] for m in models.get("models", [])]:
+        tagged_names = {m["model"] for m in models.get("models", [])}
+        model_names = tagged_names | {name.split(":")[0] for name in tagged_names}
+        if MODEL not in model_names:
             console.print(f"\n[yellow]⚠️  Model '{MODEL}' not found. Pulling it now...[/yellow]")
             console.print("[dim]This may take a few minutes on first run.[/dim]\n")
             ollama.pull(MODEL)
             console.print(f"[green]✓ Model '{MODEL}' ready![/green]\n")
+        
+        # Load the model now so the first question doesn't pay for it
+        with console.status(f"[bold blue]Loading {MODEL}...[/bold blue]"):
+            ollama.generate(model=MODEL, prompt="", keep_alive=KEEP_ALIVE)
     except Exception as e:
         console.print(f"\n[red]❌ Error connecting to Ollama: {e}[/red]")
         console.print("[yellow]Make sure Ollama is running: brew services start ollama[/yellow]")
@@ -153,11 +315,8 @@ def main():
             if not user_input.strip():
                 continue
             
-            with console.status("[bold blue]Thinking...[/bold blue]"):
-                response = chat(user_input, history)
-            
             console.print("\n[bold blue]Bot[/bold blue]")
-            console.print(Markdown(response))
+            asyncio.run(chat(user_input, history))
             
         except KeyboardInterrupt:
             console.print("\n\n[blue]👋 Goodbye![/blue]")
@@ -4,15 +4,24 @@ System tools for the machine bot.
 These functions gather information about your local machine.
 """
 
+import heapq
 import psutil
 import platform
 import socket
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 
+# Boot time doesn't change while we're running, so read and format it once
+_BOOT_TIME = psutil.boot_time()
+_BOOT_TIME_STR = datetime.fromtimestamp(_BOOT_TIME).strftime("%Y-%m-%d %H:%M:%S")
 
-def get_system_info() -> dict:
-    """Get basic system information."""
+
+@lru_cache(maxsize=1)
+def _static_system_info() -> dict:
+    """Collect system facts that don't change while the process runs."""
     uname = platform.uname()
     return {
         "system": uname.system,
@@ -25,16 +34,26 @@ def get_system_info() -> dict:
     }
 
 
+def get_system_info() -> dict:
+    """Get basic system information."""
+    # Copy so callers can't mutate the cached dict
+    return dict(_static_system_info())
+
+
 def get_cpu_info() -> dict:
     """Get CPU usage and information."""
     cpu_freq = psutil.cpu_freq()
+    
+    # Sample per-core usage once and derive the overall figure from it
+    per_core = psutil.cpu_percent(interval=0.2, percpu=True)
+    
     return {
         "physical_cores": psutil.cpu_count(logical=False),
         "total_cores": psutil.cpu_count(logical=True),
         "max_frequency_mhz": round(cpu_freq.max, 2) if cpu_freq else "N/A",
         "current_frequency_mhz": round(cpu_freq.current, 2) if cpu_freq else "N/A",
-        "cpu_usage_percent": psutil.cpu_percent(interval=1),
-        "per_core_usage": psutil.cpu_percent(interval=1, percpu=True),
+        "cpu_usage_percent": round(sum(per_core) / len(per_core), 2),
+        "per_core_usage": per_core,
     }
 
 
@@ -53,47 +72,68 @@ def get_memory_info() -> dict:
     }
 
 
+def _safe_usage(mountpoint: str):
+    """Get disk usage for a mountpoint, or None if we aren't allowed to read it."""
+    try:
+        return psutil.disk_usage(mountpoint)
+    except PermissionError:
+        return None
+
+
 def get_disk_info() -> dict:
     """Get disk usage information."""
+    disk_partitions = psutil.disk_partitions()
+    if not disk_partitions:
+        return {"partitions": []}
+    
+    # Probe all filesystems in parallel so one slow mount doesn't stall the rest
+    with ThreadPoolExecutor(max_workers=min(8, len(disk_partitions))) as executor:
+        usages = executor.map(_safe_usage, [p.mountpoint for p in disk_partitions])
+        results = list(zip(disk_partitions, usages))
+    
     partitions = []
-    for partition in psutil.disk_partitions():
-        try:
-            usage = psutil.disk_usage(partition.mountpoint)
-            partitions.append({
-                "device": partition.device,
-                "mountpoint": partition.mountpoint,
-                "filesystem": partition.fstype,
-                "total_gb": round(usage.total / (1024**3), 2),
-                "used_gb": round(usage.used / (1024**3), 2),
-                "free_gb": round(usage.free / (1024**3), 2),
-                "usage_percent": usage.percent,
-            })
-        except PermissionError:
+    for partition, usage in results:
+        if usage is None:
             continue
+        partitions.append({
+            "device": partition.device,
+            "mountpoint": partition.mountpoint,
+            "filesystem": partition.fstype,
+            "total_gb": round(usage.total / (1024**3), 2),
+            "used_gb": round(usage.used / (1024**3), 2),
+            "free_gb": round(usage.free / (1024**3), 2),
+            "usage_percent": usage.percent,
+        })
     return {"partitions": partitions}
 
 
 def get_network_info() -> dict:
     """Get network interface information."""
-    hostname = socket.gethostname()
-    try:
-        local_ip = socket.gethostbyname(hostname)
-    except socket.gaierror:
-        local_ip = "Unable to resolve"
-    
-    interfaces = {}
     net_if_addrs = psutil.net_if_addrs()
-    for interface_name, addresses in net_if_addrs.items():
-        interfaces[interface_name] = []
-        for addr in addresses:
-            interfaces[interface_name].append({
-                "address": addr.address,
-                "family": str(addr.family),
-            })
+    
+    # Take the first non-loopback IPv4 address rather than resolving the
+    # hostname, which can hang for the whole DNS timeout
+    local_ip = next(
+        (
+            addr.address
+            for addresses in net_if_addrs.values()
+            for addr in addresses
+            if addr.family == socket.AF_INET and not addr.address.startswith("127.")
+        ),
+        "N/A",
+    )
+    
+    interfaces = {
+        interface_name: [
+            {"address": addr.address, "family": str(addr.family)}
+            for addr in addresses
+        ]
+        for interface_name, addresses in net_if_addrs.items()
+    }
     
     net_io = psutil.net_io_counters()
     return {
-        "hostname": hostname,
+        "hostname": socket.gethostname(),
         "local_ip": local_ip,
         "interfaces": interfaces,
         "bytes_sent_mb": round(net_io.bytes_sent / (1024**2), 2),
@@ -101,24 +141,29 @@ def get_network_info() -> dict:
     }
 
 
-def get_process_info(limit: int = 10) -> dict:
-    """Get top processes by memory usage."""
-    processes = []
+def _iter_process_info():
+    """Yield info dicts for live processes, skipping ones we can't read."""
     for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']):
         try:
-            pinfo = proc.info
-            processes.append({
-                "pid": pinfo['pid'],
-                "name": pinfo['name'],
-                "memory_percent": round(pinfo['memory_percent'], 2) if pinfo['memory_percent'] else 0,
-                "cpu_percent": round(pinfo['cpu_percent'], 2) if pinfo['cpu_percent'] else 0,
-            })
+            yield proc.info
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             continue
-    
-    # Sort by memory usage and return top N
-    processes.sort(key=lambda x: x['memory_percent'], reverse=True)
-    return {"top_processes_by_memory": processes[:limit]}
+
+
+def get_process_info(limit: int = 10) -> dict:
+    """Get top processes by memory usage."""
+    # Keep only the top N in a heap instead of sorting every process
+    top = heapq.nlargest(limit, _iter_process_info(), key=lambda p: p['memory_percent'] or 0)
+    processes = [
+        {
+            "pid": pinfo['pid'],
+            "name": pinfo['name'],
+            "memory_percent": round(pinfo['memory_percent'], 2) if pinfo['memory_percent'] else 0,
+            "cpu_percent": round(pinfo['cpu_percent'], 2) if pinfo['cpu_percent'] else 0,
+        }
+        for pinfo in top
+    ]
+    return {"top_processes_by_memory": processes}
 
 
 def get_battery_info() -> dict:
@@ -135,29 +180,29 @@ def get_battery_info() -> dict:
 
 def get_uptime() -> dict:
     """Get system uptime."""
-    boot_time = datetime.fromtimestamp(psutil.boot_time())
-    now = datetime.now()
-    uptime = now - boot_time
-    
-    days = uptime.days
-    hours, remainder = divmod(uptime.seconds, 3600)
+    uptime = int(time.time() - _BOOT_TIME)
+    days, remainder = divmod(uptime, 86400)
+    hours, remainder = divmod(remainder, 3600)
     minutes, seconds = divmod(remainder, 60)
     
     return {
-        "boot_time": boot_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "boot_time": _BOOT_TIME_STR,
         "uptime": f"{days}d {hours}h {minutes}m {seconds}s",
     }
 
 
-# Tool registry for the chatbot
+# Tool registry for the chatbot. "cache_ttl" (seconds) overrides how long
+# a tool's result is reused before the system is probed again.
 TOOLS = {
     "get_system_info": {
         "function": get_system_info,
         "description": "Get basic system information like OS, hostname, and processor",
+        "cache_ttl": 3600,
     },
     "get_cpu_info": {
         "function": get_cpu_info,
         "description": "Get CPU usage, core count, and frequency information",
+        "cache_ttl": 2,
     },
     "get_memory_info": {
         "function": get_memory_info,
@@ -182,5 +227,6 @@ TOOLS = {
     "get_uptime": {
         "function": get_uptime,
         "description": "Get system boot time and uptime duration",
+        "cache_ttl": 60,
     },
 }